@@ -23,9 +23,9 @@ class Combo:
     fast_reset = False
     per_key_timeout = False
     timeout = 50
-    _remaining = []
     _timeout = None
     _state = _ComboState.IDLE
+    _complete = False
     _match_coord = False
 
     def __init__(
@@ -40,8 +40,13 @@ class Combo:
         '''
         match: tuple of keys (KC.A, KC.B)
         result: key KC.C
+        timeout: integer number of milliseconds
         '''
         self.match = match
+        # Remaining matches are kept in reverse order, such that the next
+        # expected match is popped from / pushed to the end of the list.
+        self._match_reversed = tuple(reversed(match))
+        self._remaining = list(self._match_reversed)
         self.result = result
         if fast_reset is not None:
             self.fast_reset = fast_reset
@@ -59,25 +64,23 @@ class Combo:
         raise NotImplementedError
 
     def has_match(self, key: Key, int_coord: int):
-        return self._match_coord and int_coord in self.match or key in self.match
+        return (int_coord if self._match_coord else key) in self.match
 
     def insert(self, key: Key, int_coord: int):
-        if self._match_coord:
-            self._remaining.insert(0, int_coord)
-        else:
-            self._remaining.insert(0, key)
+        self._remaining.append(int_coord if self._match_coord else key)
+        self._complete = False
 
     def reset(self):
-        self._remaining = list(self.match)
+        self._remaining[:] = self._match_reversed
+        self._complete = False
 
 
 class Chord(Combo):
     def matches(self, key: Key, int_coord: int):
-        if not self._match_coord and key in self._remaining:
-            self._remaining.remove(key)
-            return True
-        elif self._match_coord and int_coord in self._remaining:
-            self._remaining.remove(int_coord)
+        match = int_coord if self._match_coord else key
+        if match in self._remaining:
+            self._remaining.remove(match)
+            self._complete = not self._remaining
             return True
         else:
             return False
@@ -89,26 +92,83 @@ class Sequence(Combo):
     timeout = 1000
 
     def matches(self, key: Key, int_coord: int):
-        if (
-            not self._match_coord and self._remaining and self._remaining[0] == key
-        ) or (
-            self._match_coord and self._remaining and self._remaining[0] == int_coord
-        ):
-            self._remaining.pop(0)
+        remaining = self._remaining
+        if remaining and remaining[-1] == (int_coord if self._match_coord else key):
+            remaining.pop()
+            self._complete = not remaining
             return True
         else:
             return False
 
 
 class Combos(Module):
-    def __init__(self, combos=[]):
-        self.combos = combos
+    def __init__(self, combos=None):
+        self._indexed = ()
+        self.combos = combos if combos is not None else []
         self._key_buffer = []
+        self._buffer_net = {}
+        self._index = {}
+        self._matching = []
 
         make_key(names=('LEADER', 'LDR'))
 
+    @property
+    def combos(self):
+        return self._combos
+
+    @combos.setter
+    def combos(self, combos):
+        self._combos = combos
+        self._stale = True
+
     def during_bootup(self, keyboard):
-        self.reset(keyboard)
+        self.init_combos(keyboard)
+
+    def init_combos(self, keyboard):
+        # Map every match key / coordinate to the combos containing it, so
+        # events only have to visit combos that can possibly be affected, and
+        # bind the timeout callbacks once instead of on every key event.
+        # Runs automatically on the next key event if `self.combos` is
+        # replaced or changes length.
+        combos = self._combos
+        previous = self._indexed
+
+        # Release and drop combos that have been removed.
+        for combo in previous:
+            if combo not in combos:
+                if combo._state == _ComboState.ACTIVE:
+                    self.deactivate(keyboard, combo)
+                self.reset_combo(keyboard, combo)
+
+        # No combo left to resolve buffered keys: flush them.
+        if not self._matching and self._key_buffer:
+            self.send_key_buffer(keyboard)
+            self.clear_key_buffer()
+
+        self._index = {}
+        for combo in combos:
+            combo._on_reset = lambda c=combo: self.reset_combo(keyboard, c)
+            combo._on_timeout = lambda c=combo: self.on_timeout(keyboard, c)
+            if combo not in previous:
+                self.reset_combo(keyboard, combo)
+            for match in combo.match:
+                index = self._index.setdefault(match, [])
+                if combo not in index:
+                    index.append(combo)
+
+        self._indexed = tuple(combos)
+        self._stale = False
+
+    def candidates(self, key: Key, int_coord: Optional[int]):
+        by_key = self._index.get(key, ())
+        by_coord = self._index.get(int_coord, ())
+        if not by_coord:
+            return by_key
+        if not by_key:
+            return by_coord
+        # Mixed key and coordinate matches: key matched combos come first,
+        # followed by coordinate matched combos, each in declaration order.
+        return by_key + [c for c in by_coord if c not in by_key]
 
     def before_matrix_scan(self, keyboard):
         return
@@ -129,6 +189,9 @@ class Combos(Module):
         return
 
     def process_key(self, keyboard, key: Key, is_pressed, int_coord):
+        if self._stale or len(self._indexed) != len(self._combos):
+            self.init_combos(keyboard)
+
         if is_pressed:
             return self.on_press(keyboard, key, int_coord)
         else:
@@ -136,110 +199,112 @@ class Combos(Module):
 
     def on_press(self, keyboard: KMKKeyboard, key: Key, int_coord: Optional[int]):
         # refill potential matches from timed-out matches
-        if self.count_matching() == 0:
-            for combo in self.combos:
-                if combo._state == _ComboState.RESET:
-                    combo._state = _ComboState.MATCHING
+        if not self._matching:
+            RESET = _ComboState.RESET
+            MATCHING = _ComboState.MATCHING
+            for combo in self._combos:
+                if combo._state == RESET:
+                    self.set_state(combo, MATCHING)
+
+            # No potential matches and nothing buffered: pass the key through.
+            if not self._matching and not self._key_buffer:
+                return key
 
         # filter potential matches
-        for combo in self.combos:
-            if combo._state != _ComboState.MATCHING:
-                continue
+        IDLE = _ComboState.IDLE
+        match_count = 0
+        first_match = None
+        for combo in tuple(self._matching):
             if combo.matches(key, int_coord):
+                if not match_count:
+                    first_match = combo
+                match_count += 1
                 continue
-            combo._state = _ComboState.IDLE
-            if combo._timeout:
-                keyboard.cancel_timeout(combo._timeout)
-            combo._timeout = keyboard.set_timeout(
-                combo.timeout, lambda c=combo: self.reset_combo(keyboard, c)
-            )
-
-        match_count = self.count_matching()
+            self.set_state(combo, IDLE)
+            timeout = combo._timeout
+            if timeout:
+                keyboard.cancel_timeout(timeout)
+            combo._timeout = keyboard.set_timeout(combo.timeout, combo._on_reset)
 
         if match_count:
             # At least one combo matches current key: append key to buffer.
-            self._key_buffer.append((int_coord, key, True))
+            self.buffer_key(int_coord, key, True)
             key = None
 
-            for first_match in self.combos:
-                if first_match._state == _ComboState.MATCHING:
-                    break
-
             # Single match left: don't wait on timeout to activate
-            if match_count == 1 and not any(first_match._remaining):
+            if match_count == 1 and first_match._complete:
                 combo = first_match
                 self.activate(keyboard, combo)
                 if combo._timeout:
                     keyboard.cancel_timeout(combo._timeout)
                     combo._timeout = None
-                self._key_buffer = []
+                self.clear_key_buffer()
                 self.reset(keyboard)
 
             # Start or reset individual combo timeouts.
-            for combo in self.combos:
-                if combo._state != _ComboState.MATCHING:
-                    continue
-                if combo._timeout:
+            for combo in self._matching:
+                timeout = combo._timeout
+                if timeout:
                     if combo.per_key_timeout:
-                        keyboard.cancel_timeout(combo._timeout)
+                        keyboard.cancel_timeout(timeout)
                     else:
                         continue
-                combo._timeout = keyboard.set_timeout(
-                    combo.timeout, lambda c=combo: self.on_timeout(keyboard, c)
-                )
+                combo._timeout = keyboard.set_timeout(combo.timeout, combo._on_timeout)
         else:
             # There's no matching combo: send and reset key buffer
             if self._key_buffer:
-                self._key_buffer.append((int_coord, key, True))
+                self.buffer_key(int_coord, key, True)
                 self.send_key_buffer(keyboard)
-                self._key_buffer = []
+                self.clear_key_buffer()
                 key = None
 
         return key
 
     def on_release(self, keyboard: KMKKeyboard, key: Key, int_coord: Optional[int]):
-        for combo in self.combos:
+        candidates = self.candidates(key, int_coord)
+
+        for combo in candidates:
             if combo._state != _ComboState.ACTIVE:
                 continue
-            if combo.has_match(key, int_coord):
-                # Deactivate combo if it matches current key.
-                self.deactivate(keyboard, combo)
+            # Deactivate combo if it matches current key.
+            self.deactivate(keyboard, combo)
 
-                if combo.fast_reset:
-                    self.reset_combo(keyboard, combo)
-                    self._key_buffer = []
-                else:
-                    combo.insert(key, int_coord)
-                    combo._state = _ComboState.MATCHING
+            if combo.fast_reset:
+                self.reset_combo(keyboard, combo)
+                self.clear_key_buffer()
+            else:
+                combo.insert(key, int_coord)
+                self.set_state(combo, _ComboState.MATCHING)
 
-                key = None
-                break
+            key = None
+            break
 
         else:
             # Non-active but matching combos can either activate on key release
             # if they're the only match, or "un-match" the released key but stay
             # matching if they're a repeatable combo.
-            for combo in self.combos:
-                if combo._state != _ComboState.MATCHING:
-                    continue
-                if not combo.has_match(key, int_coord):
+            MATCHING = _ComboState.MATCHING
+            for combo in candidates:
+                if combo._state != MATCHING:
                     continue
 
+                complete = combo._complete
+
                 # Combo matches, but first key released before timeout.
-                elif not any(combo._remaining) and self.count_matching() == 1:
+                if complete and self.count_matching() == 1:
                     keyboard.cancel_timeout(combo._timeout)
                     self.activate(keyboard, combo)
-                    self._key_buffer = []
+                    self.clear_key_buffer()
                     keyboard._send_hid()
                     self.deactivate(keyboard, combo)
                     if combo.fast_reset:
                         self.reset_combo(keyboard, combo)
                     else:
                         combo.insert(key, int_coord)
-                        combo._state = _ComboState.MATCHING
+                        self.set_state(combo, MATCHING)
                     self.reset(keyboard)
 
-                elif not any(combo._remaining):
+                elif complete:
                     continue
 
                 # Skip combos that allow tapping.
@@ -250,9 +315,9 @@ class Combos(Module):
                 elif len(combo._remaining) == len(combo.match) - 1:
                     self.reset_combo(keyboard, combo)
                     if not self.count_matching():
-                        self._key_buffer.append((int_coord, key, False))
+                        self.buffer_key(int_coord, key, False)
                         self.send_key_buffer(keyboard)
-                        self._key_buffer = []
+                        self.clear_key_buffer()
                         key = None
 
                 # Anything between first and last key released.
@@ -262,10 +327,8 @@ class Combos(Module):
             # Don't propagate key-release events for keys that have been
             # buffered. Append release events only if corresponding press is in
             # buffer.
-            pressed = self._key_buffer.count((int_coord, key, True))
-            released = self._key_buffer.count((int_coord, key, False))
-            if (pressed - released) > 0:
-                self._key_buffer.append((int_coord, key, False))
+            if self._buffer_net.get((int_coord, key), 0) > 0:
+                self.buffer_key(int_coord, key, False)
                 key = None
 
         # Reset on non-combo key up
@@ -279,21 +342,35 @@ class Combos(Module):
         # else, drop it from the match list.
         combo._timeout = None
 
-        if not any(combo._remaining):
+        if combo._complete:
             self.activate(keyboard, combo)
             # check if the last buffered key event was a 'release'
             if not self._key_buffer[-1][2]:
                 keyboard._send_hid()
                 self.deactivate(keyboard, combo)
-            self._key_buffer = []
+            self.clear_key_buffer()
             self.reset(keyboard)
         else:
             if self.count_matching() == 1:
                 # This was the last pending combo: flush key buffer.
                 self.send_key_buffer(keyboard)
-                self._key_buffer = []
+                self.clear_key_buffer()
             self.reset_combo(keyboard, combo)
 
+    def buffer_key(self, int_coord, key, is_pressed):
+        self._key_buffer.append((int_coord, key, is_pressed))
+        # Keep track of presses minus releases per buffered key.
+        event = (int_coord, key)
+        net = self._buffer_net.get(event, 0) + (1 if is_pressed else -1)
+        if net:
+            self._buffer_net[event] = net
+        else:
+            del self._buffer_net[event]
+
+    def clear_key_buffer(self):
+        self._key_buffer.clear()
+        self._buffer_net.clear()
+
     def send_key_buffer(self, keyboard):
         for int_coord, key, is_pressed in self._key_buffer:
             keyboard.resume_process_key(self, key, is_pressed, int_coord)
@@ -302,29 +379,36 @@ class Combos(Module):
         if debug.enabled:
             debug('activate', combo)
         keyboard.resume_process_key(self, combo.result, True)
-        combo._state = _ComboState.ACTIVE
+        self.set_state(combo, _ComboState.ACTIVE)
 
     def deactivate(self, keyboard, combo):
         if debug.enabled:
             debug('deactivate', combo)
         keyboard.resume_process_key(self, combo.result, False)
-        combo._state = _ComboState.IDLE
+        self.set_state(combo, _ComboState.IDLE)
 
     def reset_combo(self, keyboard, combo):
         combo.reset()
         if combo._timeout is not None:
             keyboard.cancel_timeout(combo._timeout)
             combo._timeout = None
-        combo._state = _ComboState.RESET
+        self.set_state(combo, _ComboState.RESET)
 
     def reset(self, keyboard):
-        for combo in self.combos:
+        for combo in self._combos:
             if combo._state != _ComboState.ACTIVE:
                 self.reset_combo(keyboard, combo)
 
+    def set_state(self, combo, state):
+        # Keep track of matching combos, such that key events don't have to
+        # scan every combo. Note that `_matching` is ordered by when combos
+        # started matching, not by declaration order.
+        if combo._state == _ComboState.MATCHING:
+            if state != _ComboState.MATCHING:
+                self._matching.remove(combo)
+        elif state == _ComboState.MATCHING:
+            self._matching.append(combo)
+        combo._state = state
+
     def count_matching(self):
-        match_count = 0
-        for combo in self.combos:
-            if combo._state == _ComboState.MATCHING:
-                match_count += 1
-        return match_count
+        return len(self._matching)
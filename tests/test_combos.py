@@ -1,7 +1,7 @@
 import unittest
 
 from kmk.keys import KC
-from kmk.modules.combos import Chord, Combo, Combos, Sequence
+from kmk.modules.combos import Chord, Combo, Combos, Sequence, _ComboState
 from kmk.modules.layers import Layers
 from tests.keyboard_test import KeyboardTest
 
@@ -32,6 +32,7 @@ class TestCombo(unittest.TestCase):
             Sequence((KC.N3, KC.N2, KC.N1), KC.Y, fast_reset=False),
             Sequence((KC.LEADER, KC.N1), KC.V),
         ]
+        self.combos = combos
         self.keyboard = KeyboardTest(
             [combos, layers],
             [
@@ -436,6 +437,164 @@ class TestCombo(unittest.TestCase):
             [{KC.A}, {}, {KC.Z}, {}],
         )
 
+    def test_combos_changed(self):
+        keyboard = self.keyboard
+        combos = self.combos
+        t_after = self.t_after
+
+        combos.combos.append(Chord((KC.D, KC.E), KC.W))
+        keyboard.test(
+            'match: combo appended after bootup',
+            [(3, True), (4, True), (3, False), (4, False), t_after],
+            [{KC.W}, {}],
+        )
+
+        combos.combos = [Chord((KC.A, KC.E), KC.Z)]
+        keyboard.test(
+            'match: combos replaced after bootup',
+            [(0, True), (4, True), (0, False), (4, False), t_after],
+            [{KC.Z}, {}],
+        )
+        keyboard.test(
+            'no match: combo removed after bootup',
+            [(0, True), (1, True), (0, False), (1, False), t_after],
+            [{KC.A}, {KC.A, KC.B}, {KC.B}, {}],
+        )
+
+        keyboard.test(
+            'match: hold combo',
+            [(0, True), (4, True)],
+            [{KC.Z}],
+        )
+        combos.combos.pop()
+        keyboard.test(
+            'release: combo removed while active',
+            [(0, False), (4, False), t_after],
+            [{}],
+        )
+
+        keyboard.test(
+            'no match: all combos removed after bootup',
+            [(0, True), (4, True), (0, False), (4, False), t_after],
+            [{KC.A}, {KC.A, KC.E}, {KC.E}, {}],
+        )
+
+        # Press a key of a slow combo without waiting on its timeout, then
+        # remove the combo while the key is still buffered.
+        combos.combos = [Chord((KC.A, KC.E), KC.Z, timeout=1000)]
+        keyboard.pins[0].value = True
+        keyboard.do_main_loop()
+        combos.combos = []
+        keyboard.test(
+            'flush: combo removed while partially matched',
+            [(0, False), t_after],
+            [{KC.A}, {}],
+        )
+
+    def test_pass_through(self):
+        keyboard = self.keyboard
+        t_within = self.t_within
+        t_after = self.t_after
+
+        keyboard.test(
+            'no match: combo key right after non-combo key',
+            [(4, True), t_within, (0, True), (4, False), (0, False), t_after],
+            [{KC.E}, {KC.E, KC.A}, {KC.A}, {}],
+        )
+
+        keyboard.test(
+            'no match: combo keys pressed while non-combo key is held',
+            [
+                (4, True),
+                (0, True),
+                (1, True),
+                (0, False),
+                (1, False),
+                (4, False),
+                t_after,
+            ],
+            [
+                {KC.E},
+                {KC.E, KC.A},
+                {KC.E, KC.A, KC.B},
+                {KC.E, KC.B},
+                {KC.E},
+                {},
+            ],
+        )
+
+    def test_matching(self):
+        keyboard = self.keyboard
+        combos = self.combos
+        t_within = self.t_within
+        t_after = self.t_after
+
+        def assert_matching_consistent():
+            self.assertEqual(
+                set(combos._matching),
+                {c for c in combos.combos if c._state == _ComboState.MATCHING},
+            )
+            self.assertEqual(len(combos._matching), len(set(combos._matching)))
+
+        keyboard.test(
+            'match: 2 combo, within timeout',
+            [(0, True), t_within, (1, True), (0, False), (1, False), t_after],
+            [{KC.X}, {}],
+        )
+        assert_matching_consistent()
+
+        keyboard.test(
+            'match: 2 combo, partial release and repeat',
+            [
+                (0, True),
+                (1, True),
+                t_after,
+                (1, False),
+                t_after,
+                (1, True),
+                (1, False),
+                (0, False),
+                t_after,
+            ],
+            [{KC.X}, {}, {KC.X}, {}],
+        )
+        assert_matching_consistent()
+
+        keyboard.test(
+            'no match: partial combo, then other key',
+            [(0, True), (4, True), (0, False), (4, False), t_after],
+            [{KC.A}, {KC.A, KC.E}, {KC.E}, {}],
+        )
+        assert_matching_consistent()
+
+        keyboard.test(
+            'no match: partial combo, after timeout',
+            [(0, True), t_after, (0, False), t_after],
+            [{KC.A}, {}],
+        )
+        assert_matching_consistent()
+
+    def test_default_combos_not_shared(self):
+        first = Combos()
+        second = Combos()
+        self.assertIsNot(first.combos, second.combos)
+
+        first.combos.append(Chord((KC.A, KC.B), KC.X))
+        self.assertEqual(second.combos, [])
+
+    def test_combo_replaced_in_place(self):
+        keyboard = self.keyboard
+        combos = self.combos
+        t_after = self.t_after
+
+        combos.combos[1] = Chord((KC.A, KC.E), KC.X)
+        combos.init_combos(keyboard.keyboard)
+        keyboard.test(
+            'match: combo replaced in place',
+            [(0, True), (4, True), (0, False), (4, False), t_after],
+            [{KC.X}, {}],
+        )
+
     def test_sequence(self):
         keyboard = self.keyboard
         t_within = self.t_within
@@ -541,5 +700,120 @@ class TestCombo(unittest.TestCase):
         )
 
 
+class TestComboMatchCoord(unittest.TestCase):
+    def setUp(self):
+        self.t_within = 2 * KeyboardTest.loop_delay_ms
+        self.t_after = 7 * KeyboardTest.loop_delay_ms
+        timeout = (self.t_after + self.t_within) // 2
+
+        # overide default timeouts
+        Combo.timeout = timeout
+        Sequence.timeout = timeout
+
+        combos = Combos()
+        combos.combos = [
+            Chord((0, 1), KC.X, match_coord=True),
+            Sequence((2, 0), KC.Y, match_coord=True),
+        ]
+        self.keyboard = KeyboardTest(
+            [combos],
+            [[KC.A, KC.B, KC.C, KC.D]],
+            debug_enabled=False,
+        )
+
+    def test_chord(self):
+        keyboard = self.keyboard
+        t_after = self.t_after
+
+        keyboard.test(
+            'match: coordinate chord',
+            [(0, True), (1, True), (0, False), (1, False), t_after],
+            [{KC.X}, {}],
+        )
+
+        keyboard.test(
+            'match: coordinate chord, shuffled',
+            [(1, True), (0, True), (1, False), (0, False), t_after],
+            [{KC.X}, {}],
+        )
+
+        keyboard.test(
+            'no match: coordinate chord, only waiting on coordinate 0',
+            [(1, True), (1, False), t_after],
+            [{KC.B}, {}],
+        )
+
+        keyboard.test(
+            'no match: other coordinate',
+            [(3, True), (3, False), t_after],
+            [{KC.D}, {}],
+        )
+
+    def test_sequence(self):
+        keyboard = self.keyboard
+        t_within = self.t_within
+        t_after = self.t_after
+
+        keyboard.test(
+            'match: coordinate sequence',
+            [(2, True), (2, False), t_within, (0, True), (0, False), t_after],
+            [{KC.Y}, {}],
+        )
+
+        keyboard.test(
+            'no match: coordinate sequence, only waiting on coordinate 0',
+            [(2, True), (2, False), t_after],
+            [{KC.C}, {}],
+        )
+
+        keyboard.test(
+            'no match: coordinate sequence, out of order',
+            [(0, True), (0, False), t_within, (2, True), (2, False), t_after],
+            [{KC.A}, {}, {KC.C}, {}],
+        )
+
+
+class TestComboRepeatedKey(unittest.TestCase):
+    def setUp(self):
+        self.t_within = 2 * KeyboardTest.loop_delay_ms
+        self.t_after = 7 * KeyboardTest.loop_delay_ms
+        timeout = (self.t_after + self.t_within) // 2
+
+        # overide default timeouts
+        Combo.timeout = timeout
+
+        combos = Combos()
+        combos.combos = [
+            Chord((KC.A, KC.A), KC.X),
+        ]
+        self.keyboard = KeyboardTest(
+            [combos],
+            [[KC.A, KC.A, KC.B]],
+            debug_enabled=False,
+        )
+
+    def test_chord(self):
+        keyboard = self.keyboard
+        t_after = self.t_after
+
+        keyboard.test(
+            'match: repeated key chord',
+            [(0, True), (1, True), (0, False), (1, False), t_after],
+            [{KC.X}, {}],
+        )
+
+        keyboard.test(
+            'no match: repeated key chord, single key',
+            [(0, True), (0, False), t_after],
+            [{KC.A}, {}],
+        )
+
+        keyboard.test(
+            'no match: repeated key chord, other key',
+            [(0, True), (2, True), (0, False), (2, False), t_after],
+            [{KC.A}, {KC.A, KC.B}, {KC.B}, {}],
+        )
+
+
 if __name__ == '__main__':
     unittest.main()